@@ -0,0 +1,120 @@
+import time
+import numpy as np
+from monte_carlo_imm import compute_exposure_metrics
+from netting_exposure import simulate_netting_set_mtm, synthetic_book
+
+
+def lagged_mtm_bridge(mtm, dt, lag, seed=None):
+    """
+    MtM at t_i - lag for every grid date t_i, taken from the already-simulated cube.
+
+    Lag dates that fall on the grid are read directly; the others are sampled by a
+    Brownian bridge between the bracketing grid points, with the local MtM vol of each
+    interval estimated from the cross-path std of its increments.
+    All dates are handled in one vectorized pass, no re-simulation.
+    """
+    n_paths, n_points = mtm.shape
+    lag_times = np.maximum(np.arange(n_points) * dt - lag, 0.0)
+    pos = lag_times / dt
+    left = np.minimum(np.floor(pos + 1e-9).astype(int), n_points - 1)
+    w = (pos - left).astype(mtm.dtype)
+    w[w < 1e-9] = 0.0
+    right = np.minimum(left + 1, n_points - 1)
+
+    interval_sd = np.append(np.diff(mtm, axis=1).std(axis=0), 0.0)
+    V_left = mtm[:, left]
+    lagged = V_left + w * (mtm[:, right] - V_left)
+
+    off_grid = w > 0
+    if off_grid.any():
+        rng = np.random.default_rng(seed)
+        bridge_sd = interval_sd[left[off_grid]] * np.sqrt(w[off_grid] * (1 - w[off_grid]))
+        z = rng.standard_normal((n_paths, off_grid.sum())).astype(mtm.dtype, copy=False)
+        lagged[:, off_grid] += bridge_sd * z
+    return lagged
+
+
+def collateral_balances(lagged_mtm, threshold=0.0, mta=0.0, own_threshold=None):
+    """
+    Variation margin held at each date, set from MtM observed one MPoR earlier.
+    Positive = collateral received, negative = collateral posted.
+    A margin call only moves the balance when the change is at least the MTA
+    (calls happen once per grid date).
+    """
+    if own_threshold is None:
+        own_threshold = threshold
+    target = np.maximum(lagged_mtm - threshold, 0) - np.maximum(-lagged_mtm - own_threshold, 0)
+    if mta <= 0:
+        return target
+
+    balances = np.empty_like(target)
+    current = np.zeros(target.shape[0], dtype=target.dtype)
+    for i in range(target.shape[1]):
+        current = np.where(np.abs(target[:, i] - current) >= mta, target[:, i], current)
+        balances[:, i] = current
+    return balances
+
+
+def collateralized_exposure(
+    mtm,
+    dt,
+    threshold=0.0,
+    mta=0.0,
+    independent_amount=0.0,
+    mpor_days=10,
+    own_threshold=None,
+    days_per_year=252,
+    seed=None
+):
+    """
+    Collateralized exposure E(t) = max(V(t) - VM(t) - IA, 0), with VM(t) computed from V(t - MPoR)
+
+    mtm: signed netted MtM cube (n_paths x n_steps+1), e.g. from simulate_netting_set_mtm,
+         or V from monte_carlo_exposure_paths for a single long option
+    independent_amount: IA received from the counterparty (posted IA: pass a negative value)
+
+    Returns the exposure paths (feed compute_exposure_metrics) and the VM balances
+    """
+    lagged = lagged_mtm_bridge(mtm, dt, mpor_days / days_per_year, seed)
+    collateral = collateral_balances(lagged, threshold, mta, own_threshold)
+    exposure = np.maximum(mtm - collateral - independent_amount, 0)
+    return exposure, collateral
+
+
+def benchmark_collateral_mpor(
+    n_assets=20,
+    n_paths=20_000,
+    maturity=1.0,
+    mpor_days=10,
+    threshold=0.0,
+    mta=1.0,
+    independent_amount=0.0,
+    seed=0
+):
+    """
+    Runtime and collateralized EE/PFE of the monthly grid + Brownian bridge approach
+    versus re-simulating the netting set on a daily grid with an exact MPoR lag
+    """
+    spots, vols, corr, trades = synthetic_book(n_assets, maturity, seed)
+    csa = dict(threshold=threshold, mta=mta, independent_amount=independent_amount, mpor_days=mpor_days)
+
+    results = {}
+    print(f"\n⏱️ Collateralized exposure: {n_assets} underlyings × {n_paths} paths, MPoR {mpor_days} days")
+    for label, steps_per_year in (("bridge", 12), ("daily", 252)):
+        start = time.perf_counter()
+        mtm, dt = simulate_netting_set_mtm(
+            spots, vols, trades, rate=0.03, corr=corr,
+            steps_per_year=steps_per_year, n_paths=n_paths, seed=seed
+        )
+        exposure, _ = collateralized_exposure(mtm, dt, seed=seed, **csa)
+        EE, EPE, EEPE, PFE = compute_exposure_metrics(exposure, dt)
+        elapsed = time.perf_counter() - start
+
+        results[label] = {"seconds": elapsed, "EPE": float(EPE), "peak_EE": float(EE.max()),
+                          "peak_PFE": float(PFE.max())}
+        print(f"  ➤ {label}: {elapsed:.2f}s, EPE {EPE:.4f}, peak EE {EE.max():.4f}, peak PFE {PFE.max():.4f}")
+
+    speedup = results["daily"]["seconds"] / results["bridge"]["seconds"]
+    print(f"  ✅ Bridge speed-up vs daily grid: {speedup:.1f}x")
+    results["speedup"] = speedup
+    return results
@@ -2,6 +2,7 @@ import yfinance as yf
 import numpy as np
 from datetime import datetime
 from fredapi import Fred
+from vol_estimators import close_to_close_vol
 
 class MarketEnvironment:
     def __init__(self):
@@ -66,8 +67,7 @@ class MarketEnvironment:
 
         try:
             hist = yf_ticker.history(period=self.vol_period)["Close"]
-            returns = hist.pct_change().dropna()
-            self.volatility = returns.std() * np.sqrt(252)
+            self.volatility = float(close_to_close_vol(hist.values)[0])
             print(f"→ Estimated annualized volatility: {self.volatility:.2%}")
         except:
             self.volatility = self._prompt_or_keep_default("Volatility calculation", self.volatility, float)
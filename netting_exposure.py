@@ -0,0 +1,214 @@
+import time
+import tracemalloc
+import numpy as np
+from scipy.special import ndtr
+from monte_carlo_imm import compute_exposure_metrics
+
+
+def estimate_correlation(price_history):
+    """
+    Estimate the correlation matrix of daily log returns
+    price_history: array of shape (n_days, n_assets)
+    """
+    prices = np.asarray(price_history, dtype=float)
+    log_returns = np.diff(np.log(prices), axis=0)
+    return np.corrcoef(log_returns, rowvar=False)
+
+
+def factor_loadings(corr, n_factors=5):
+    """
+    Approximate a correlation matrix with a PCA factor model
+    Returns loadings B (n_assets x n_factors) and idiosyncratic vols so that
+    corr ≈ B B' + diag(idio²)
+    """
+    eigvals, eigvecs = np.linalg.eigh(corr)
+    order = np.argsort(eigvals)[::-1][:n_factors]
+    loadings = eigvecs[:, order] * np.sqrt(np.maximum(eigvals[order], 0.0))
+    idio = np.sqrt(np.clip(1.0 - np.sum(loadings ** 2, axis=1), 0.0, None))
+    return loadings, idio
+
+
+def correlation_cholesky(corr):
+    """
+    Cholesky factor of a correlation matrix
+    Negative eigenvalues (non-PSD estimates from short histories) are floored before factorizing
+    """
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        fixed = (eigvecs * np.maximum(eigvals, 1e-10)) @ eigvecs.T
+        d = np.sqrt(np.diag(fixed))
+        return np.linalg.cholesky(fixed / np.outer(d, d))
+
+
+def _trade_arrays(trades, vols, dividend_yields, dtype):
+    idx = np.array([t["underlying"] for t in trades], dtype=int)
+    return {
+        "idx": idx,
+        "strike": np.array([t["strike"] for t in trades], dtype=dtype),
+        "maturity": np.array([t["maturity"] for t in trades], dtype=float),
+        "is_call": np.array([t.get("option_type", "call") == "call" for t in trades]),
+        "quantity": np.array([t.get("quantity", 1.0) for t in trades], dtype=dtype),
+        "sigma": vols[idx],
+        "q": dividend_yields[idx],
+    }
+
+
+def _netted_value(S, t, trades, rate, dtype):
+    """BSM value of every trade at time t, netted per scenario (S: n_scenarios x n_assets)"""
+    tau = trades["maturity"] - t
+    alive = (tau > -1e-9).astype(dtype)
+    tau = np.maximum(tau, 1e-6).astype(dtype)  # Prevent division by zero at expiry
+
+    K, sigma, q = trades["strike"], trades["sigma"], trades["q"]
+    St = S[:, trades["idx"]]
+    sqrt_tau = np.sqrt(tau)
+    d1 = (np.log(St / K) + (rate - q + 0.5 * sigma ** 2) * tau) / (sigma * sqrt_tau)
+    d2 = d1 - sigma * sqrt_tau
+    disc_q = np.exp(-q * tau)
+    disc_r = np.exp(-rate * tau).astype(dtype)
+
+    call = disc_q * St * ndtr(d1) - disc_r * K * ndtr(d2)
+    # Put via put-call parity so each trade is priced once
+    value = np.where(trades["is_call"], call, call - disc_q * St + disc_r * K)
+    return value @ (trades["quantity"] * alive)
+
+
+def _correlated_shocks(rng, n, n_assets, chol, loadings, idio, dtype):
+    if loadings is not None:
+        factors = rng.standard_normal((n, loadings.shape[1]), dtype=dtype)
+        eps = rng.standard_normal((n, n_assets), dtype=dtype)
+        return factors @ loadings.T + eps * idio
+    return rng.standard_normal((n, n_assets), dtype=dtype) @ chol.T
+
+
+def simulate_netting_set_mtm(
+    spots,
+    vols,
+    trades,
+    rate,
+    corr=None,
+    loadings=None,
+    idio=None,
+    dividend_yields=None,
+    horizon=None,
+    steps_per_year=12,
+    n_paths=10000,
+    chunk_size=10000,
+    dtype=np.float64,
+    seed=None
+):
+    """
+    Simulate correlated GBM paths for all underlyings on a shared time grid
+    (monthly by default, steps_per_year=252 for daily) and net the mark-to-market
+    of every trade per scenario.
+
+    trades: list of dicts with keys 'underlying' (asset index), 'strike', 'maturity',
+            and optionally 'option_type' ('call'/'put') and 'quantity' (signed)
+    Shocks come from the Cholesky factor of corr, or from a factor model (loadings, idio).
+    Paths are generated chunk_size at a time, so peak memory is O(chunk_size × n_assets)
+    plus the netted MtM cube. dtype=np.float32 halves memory and speeds up the BLAS calls.
+
+    Returns the netted MtM (n_paths x n_steps+1, signed) and dt
+    """
+    dtype = np.dtype(dtype)
+    spots = np.asarray(spots, dtype=float)
+    n_assets = spots.shape[0]
+    vols = np.asarray(vols, dtype=dtype)
+    if dividend_yields is None:
+        dividend_yields = np.zeros(n_assets)
+    dividend_yields = np.asarray(dividend_yields, dtype=dtype)
+
+    if loadings is None and corr is None:
+        raise ValueError("Either corr or loadings must be provided.")
+    chol = None
+    if loadings is not None:
+        loadings = np.asarray(loadings, dtype=dtype)
+        if idio is None:
+            idio = np.sqrt(np.clip(1.0 - np.sum(loadings ** 2, axis=1), 0.0, None))
+        idio = np.asarray(idio, dtype=dtype)
+    else:
+        chol = correlation_cholesky(np.asarray(corr, dtype=float)).astype(dtype)
+
+    trade_data = _trade_arrays(trades, vols, dividend_yields, dtype)
+    if horizon is None:
+        horizon = trade_data["maturity"].max()
+    n_steps = max(int(np.round(horizon * steps_per_year)), 1)
+    dt = horizon / n_steps
+
+    drift = ((rate - dividend_yields - 0.5 * vols ** 2) * dt).astype(dtype)
+    diffusion = (vols * np.sqrt(dt)).astype(dtype)
+    log_s0 = np.log(spots).astype(dtype)
+
+    rng = np.random.default_rng(seed)
+    mtm = np.empty((n_paths, n_steps + 1), dtype=dtype)
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        log_s = np.tile(log_s0, (stop - start, 1))
+        mtm[start:stop, 0] = _netted_value(np.exp(log_s), 0.0, trade_data, rate, dtype)
+        for t in range(1, n_steps + 1):
+            z = _correlated_shocks(rng, stop - start, n_assets, chol, loadings, idio, dtype)
+            log_s += drift + diffusion * z
+            mtm[start:stop, t] = _netted_value(np.exp(log_s), t * dt, trade_data, rate, dtype)
+
+    return mtm, dt
+
+
+def netting_set_exposure_paths(*args, **kwargs):
+    """
+    Netted positive exposure max(sum of trade MtM, 0) per scenario
+    Same arguments as simulate_netting_set_mtm; output feeds compute_exposure_metrics
+    """
+    mtm, dt = simulate_netting_set_mtm(*args, **kwargs)
+    return np.maximum(mtm, 0), dt
+
+
+def synthetic_book(n_assets, maturity=1.0, seed=0):
+    """
+    Benchmark book: one ATM option per underlying, alternating long call / short put,
+    one-factor correlation structure. Returns spots, vols, corr, trades
+    """
+    rng = np.random.default_rng(seed)
+    spots = rng.uniform(50, 150, n_assets)
+    vols = rng.uniform(0.15, 0.45, n_assets)
+    beta = rng.uniform(0.2, 0.6, (n_assets, 1))
+    corr = beta @ beta.T
+    np.fill_diagonal(corr, 1.0)
+    trades = [
+        {"underlying": i, "strike": spots[i], "maturity": maturity,
+         "option_type": "call" if i % 2 == 0 else "put",
+         "quantity": 1.0 if i % 2 == 0 else -1.0}
+        for i in range(n_assets)
+    ]
+    return spots, vols, corr, trades
+
+
+def benchmark_netting_set(n_assets=100, n_paths=100_000, chunk_size=10_000, maturity=1.0, seed=0):
+    """Throughput and peak memory of a netting-set EE/PFE run, float64 vs float32"""
+    spots, vols, corr, trades = synthetic_book(n_assets, maturity, seed)
+    results = {}
+    print(f"\n⏱️ Netting-set benchmark: {n_assets} underlyings × {n_paths} paths (chunk {chunk_size})")
+    for dtype in (np.float64, np.float32):
+        tracemalloc.start()
+        start = time.perf_counter()
+        V, dt = netting_set_exposure_paths(
+            spots, vols, trades, rate=0.03, corr=corr,
+            n_paths=n_paths, chunk_size=chunk_size, dtype=dtype, seed=seed
+        )
+        EE, EPE, EEPE, PFE = compute_exposure_metrics(V, dt)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        name = np.dtype(dtype).name
+        results[name] = {
+            "seconds": elapsed,
+            "paths_per_second": n_paths / elapsed,
+            "peak_mb": peak / 1e6,
+            "EEPE": float(EEPE),
+            "peak_PFE": float(PFE.max()),
+        }
+        print(f"  ➤ {name}: {elapsed:.2f}s ({n_paths / elapsed:,.0f} paths/s), "
+              f"peak memory {peak / 1e6:.1f} MB, EEPE {EEPE:.4f}, max PFE {PFE.max():.4f}")
+    return results
@@ -9,14 +9,14 @@ from math import log, sqrt, exp
 from market_env_updated import MarketEnvironment
 from bsm_model import BlackScholesModel
 from greeks import GreeksCalculator
+from vol_estimators import rolling_close_to_close_vol
 
 def plot_historical_volatility(ticker="AAPL", period="6mo"):
     data = yf.download(ticker, period=period)["Close"]
-    log_returns = np.log(data / data.shift(1)).dropna()
-    vol = log_returns.rolling(window=21).std() * np.sqrt(252)
+    vol = rolling_close_to_close_vol(data.values, window=21)[:, 0]
 
     plt.figure(figsize=(10, 4))
-    plt.plot(vol, label="21-day Rolling Vol")
+    plt.plot(data.index[1:], vol, label="21-day Rolling Vol")
     plt.title(f"Historical Volatility: {ticker} ({period})")
     plt.xlabel("Date")
     plt.ylabel("Volatility (Annualized)")
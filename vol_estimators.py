@@ -0,0 +1,264 @@
+import numpy as np
+from bsm_model import BlackScholesModel
+
+TRADING_DAYS = 252
+
+
+def _as_panel(x):
+    """Coerce prices to a (n_days, n_tickers) float array; 1D input is one ticker"""
+    x = np.asarray(x, dtype=float)
+    return x.reshape(-1, 1) if x.ndim == 1 else x
+
+
+# --- Batch estimators: every function works on a whole universe at once (columns = tickers)
+
+def close_to_close_vol(close, annualization=TRADING_DAYS):
+    """Annualized sample std of daily log returns"""
+    log_returns = np.diff(np.log(_as_panel(close)), axis=0)
+    return log_returns.std(axis=0, ddof=1) * np.sqrt(annualization)
+
+
+def rolling_close_to_close_vol(close, window=21, annualization=TRADING_DAYS):
+    """
+    Rolling close-to-close vol from cumulative sums, O(n_days) regardless of window
+    Returns (n_days - 1, n_tickers), NaN until the first full window
+    """
+    r = np.diff(np.log(_as_panel(close)), axis=0)
+    zero = np.zeros((1, r.shape[1]))
+    cs = np.concatenate([zero, np.cumsum(r, axis=0)])
+    cs2 = np.concatenate([zero, np.cumsum(r ** 2, axis=0)])
+    s = cs[window:] - cs[:-window]
+    s2 = cs2[window:] - cs2[:-window]
+    var = np.maximum((s2 - s ** 2 / window) / (window - 1), 0.0)
+
+    out = np.full(r.shape, np.nan)
+    out[window - 1:] = np.sqrt(var * annualization)
+    return out
+
+
+def parkinson_vol(high, low, annualization=TRADING_DAYS):
+    """Parkinson range estimator: σ² = mean(ln(H/L)²) / (4 ln 2)"""
+    hl = np.log(_as_panel(high) / _as_panel(low))
+    return np.sqrt((hl ** 2).mean(axis=0) / (4 * np.log(2)) * annualization)
+
+
+def _yang_zhang_terms(open_, high, low, close, prev_close):
+    overnight = np.log(open_ / prev_close)
+    open_close = np.log(close / open_)
+    rs = np.log(high / close) * np.log(high / open_) + np.log(low / close) * np.log(low / open_)
+    return overnight, open_close, rs
+
+
+def _yang_zhang_k(n):
+    return 0.34 / (1.34 + (n + 1) / (n - 1))
+
+
+def yang_zhang_vol(open_, high, low, close, annualization=TRADING_DAYS):
+    """
+    Yang-Zhang estimator: σ² = σ²_overnight + k σ²_open-close + (1 - k) σ²_Rogers-Satchell
+    Uses days 1..n (day 0 only supplies the previous close)
+    """
+    open_, high, low, close = (_as_panel(x) for x in (open_, high, low, close))
+    overnight, open_close, rs = _yang_zhang_terms(open_[1:], high[1:], low[1:], close[1:], close[:-1])
+    n = overnight.shape[0]
+    k = _yang_zhang_k(n)
+    var = overnight.var(axis=0, ddof=1) + k * open_close.var(axis=0, ddof=1) + (1 - k) * rs.mean(axis=0)
+    return np.sqrt(var * annualization)
+
+
+def ewma_variance(close, lam=0.94):
+    """
+    RiskMetrics EWMA of squared log returns, vectorized across tickers
+    Seeded with the sample variance; returns the variance for the next day
+    """
+    r = np.diff(np.log(_as_panel(close)), axis=0)
+    var = r.var(axis=0, ddof=1)
+    for r_t in r:
+        var = lam * var + (1 - lam) * r_t ** 2
+    return var
+
+
+def ewma_vol(close, lam=0.94, annualization=TRADING_DAYS):
+    return np.sqrt(ewma_variance(close, lam) * annualization)
+
+
+def fit_garch11(
+    close,
+    alphas=np.linspace(0.02, 0.20, 10),
+    persistences=np.linspace(0.80, 0.995, 14)
+):
+    """
+    Fit GARCH(1,1) h_t+1 = ω + α r_t² + β h_t for every ticker at once.
+    ω is pinned by variance targeting; (α, β) are picked from a grid by Gaussian
+    log-likelihood, evaluated for all grid points and tickers in one pass over time.
+
+    Returns dict of arrays (n_tickers,): omega, alpha, beta, variance (next-day h)
+    """
+    r = np.diff(np.log(_as_panel(close)), axis=0)
+    n_tickers = r.shape[1]
+    a, p = np.meshgrid(alphas, persistences, indexing="ij")
+    a, p = a.ravel(), p.ravel()
+    keep = (p - a > 0) & (p < 1)
+    a, b = a[keep], (p - a)[keep]
+
+    sample_var = r.var(axis=0, ddof=1)
+    omega = np.outer(1 - a - b, sample_var)
+    h = np.tile(sample_var, (a.shape[0], 1))
+    loglik = np.zeros_like(h)
+    for r_t in r:
+        loglik -= np.log(h) + r_t ** 2 / h
+        h = omega + a[:, None] * r_t ** 2 + b[:, None] * h
+
+    best = loglik.argmax(axis=0)
+    cols = np.arange(n_tickers)
+    return {
+        "omega": omega[best, cols],
+        "alpha": a[best],
+        "beta": b[best],
+        "variance": h[best, cols],
+    }
+
+
+def garch11_vol(close, annualization=TRADING_DAYS):
+    return np.sqrt(fit_garch11(close)["variance"] * annualization)
+
+
+# --- Incremental engine
+
+class _RollingWindow:
+    """Ring buffer with running sum / sum of squares: O(1) mean and variance updates"""
+
+    def __init__(self, history, window):
+        if history.shape[0] < window:
+            raise ValueError(f"Need at least {window} observations, got {history.shape[0]}.")
+        self.window = window
+        self.buffer = history[-window:].T.copy()  # (n_tickers, window)
+        self.pos = 0
+        self._resum()
+
+    def _resum(self):
+        # Periodic exact recompute keeps floating-point drift of the running sums bounded
+        self.total = self.buffer.sum(axis=1)
+        self.total_sq = (self.buffer ** 2).sum(axis=1)
+
+    def push(self, x):
+        old = self.buffer[:, self.pos]
+        self.total += x - old
+        self.total_sq += x ** 2 - old ** 2
+        self.buffer[:, self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        if self.pos == 0:
+            self._resum()
+
+    def mean(self):
+        return self.total / self.window
+
+    def var(self):
+        n = self.window
+        return np.maximum((self.total_sq - self.total ** 2 / n) / (n - 1), 0.0)
+
+
+class VolatilityEngine:
+    """
+    Volatility estimates for a universe of tickers, kept current with O(1) updates.
+
+    Initialize from a (n_days, n_tickers) price history; each call to update()
+    with one new day of prices refreshes every estimator without touching history.
+    Open/high/low are optional: without them only close-to-close, EWMA and GARCH
+    are available.
+    """
+
+    METHODS = ("close_to_close", "parkinson", "yang_zhang", "ewma", "garch")
+
+    def __init__(self, close, open_=None, high=None, low=None, tickers=None,
+                 window=21, ewma_lambda=0.94, annualization=TRADING_DAYS):
+        close = _as_panel(close)
+        self.tickers = list(tickers) if tickers is not None else list(range(close.shape[1]))
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.annualization = annualization
+        self.has_ohlc = open_ is not None and high is not None and low is not None
+
+        log_returns = np.diff(np.log(close), axis=0)
+        self._returns = _RollingWindow(log_returns, window)
+        self._ewma_var = ewma_variance(close, ewma_lambda)
+        self._garch = fit_garch11(close)
+        self._last_close = close[-1].copy()
+
+        if self.has_ohlc:
+            open_, high, low = _as_panel(open_), _as_panel(high), _as_panel(low)
+            hl = np.log(high / low) ** 2
+            overnight, open_close, rs = _yang_zhang_terms(open_[1:], high[1:], low[1:], close[1:], close[:-1])
+            self._hl = _RollingWindow(hl, window)
+            self._overnight = _RollingWindow(overnight, window)
+            self._open_close = _RollingWindow(open_close, window)
+            self._rs = _RollingWindow(rs, window)
+
+    @classmethod
+    def from_yfinance(cls, tickers, period="1y", **kwargs):
+        """Build from yfinance daily OHLC for a list of tickers"""
+        import yfinance as yf
+        data = yf.download(list(tickers), period=period, auto_adjust=False, progress=False).dropna()
+        fields = [data[f][list(tickers)].values for f in ("Open", "High", "Low", "Close")]
+        return cls(fields[3], open_=fields[0], high=fields[1], low=fields[2], tickers=tickers, **kwargs)
+
+    def update(self, close, open_=None, high=None, low=None):
+        """Roll every estimator forward by one day of prices (arrays of n_tickers)"""
+        close = np.asarray(close, dtype=float)
+        r = np.log(close / self._last_close)
+        r2 = r ** 2
+
+        self._returns.push(r)
+        self._ewma_var = self.ewma_lambda * self._ewma_var + (1 - self.ewma_lambda) * r2
+        g = self._garch
+        g["variance"] = g["omega"] + g["alpha"] * r2 + g["beta"] * g["variance"]
+
+        if self.has_ohlc:
+            if open_ is None or high is None or low is None:
+                raise ValueError("Engine was built with OHLC data; update() needs open_, high and low.")
+            open_, high, low = (np.asarray(x, dtype=float) for x in (open_, high, low))
+            overnight, open_close, rs = _yang_zhang_terms(open_, high, low, close, self._last_close)
+            self._hl.push(np.log(high / low) ** 2)
+            self._overnight.push(overnight)
+            self._open_close.push(open_close)
+            self._rs.push(rs)
+
+        self._last_close = close
+
+    def vols(self, method="close_to_close"):
+        """Annualized vol for every ticker, in the order of self.tickers"""
+        if method == "close_to_close":
+            var = self._returns.var()
+        elif method == "ewma":
+            var = self._ewma_var
+        elif method == "garch":
+            var = self._garch["variance"]
+        elif method in ("parkinson", "yang_zhang"):
+            if not self.has_ohlc:
+                raise ValueError(f"{method} requires open/high/low prices.")
+            if method == "parkinson":
+                var = self._hl.mean() / (4 * np.log(2))
+            else:
+                k = _yang_zhang_k(self.window)
+                var = self._overnight.var() + k * self._open_close.var() + (1 - k) * self._rs.mean()
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+        return np.sqrt(var * self.annualization)
+
+    def vol(self, ticker, method="close_to_close"):
+        return float(self.vols(method)[self.tickers.index(ticker)])
+
+    def black_scholes_model(self, ticker, strike, maturity, rate, method="close_to_close",
+                            dividend_yield=0.0, spot=None):
+        """BlackScholesModel for one ticker using the engine's vol (and last close as spot by default)"""
+        i = self.tickers.index(ticker)
+        spot = self._last_close[i] if spot is None else spot
+        return BlackScholesModel(spot, strike, maturity, rate, self.vol(ticker, method), dividend_yield)
+
+    def summary(self):
+        print(f"\n📈 Volatility Estimates (annualized, {self.window}-day window)")
+        methods = [m for m in self.METHODS if self.has_ohlc or m not in ("parkinson", "yang_zhang")]
+        table = {m: self.vols(m) for m in methods}
+        for i, ticker in enumerate(self.tickers):
+            row = "  ".join(f"{m}: {table[m][i]:.2%}" for m in methods)
+            print(f"  ➤ {ticker}: {row}")